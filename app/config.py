@@ -15,6 +15,12 @@ class Settings:
 
     crawl_spider: str = os.getenv("CRAWL_SPIDER", "products")
     crawl_log: str = os.getenv("CRAWL_LOG", "/data/logs/scrapy.log")
+    crawl_run_id: str | None = os.getenv("CRAWL_RUN_ID")
+    pipeline_batch_size: int = int(os.getenv("PIPELINE_BATCH_SIZE", "500"))
+    removal_max_ratio: float = float(os.getenv("REMOVAL_MAX_RATIO", "0.2"))
+    full_crawl_bloom_error_rate: float = float(
+        os.getenv("FULL_CRAWL_BLOOM_ERROR_RATE", "1e-7")
+    )
 
     message_strategy: str = os.getenv("MESSAGE_STRATEGY", "S2")
     telegram_target_chat: str | None = os.getenv("TG_TARGET_CHAT")
@@ -0,0 +1,283 @@
+import hashlib
+import logging
+import math
+import os
+import struct
+from pathlib import Path
+from typing import BinaryIO, List
+
+from scrapy.dupefilters import RFPDupeFilter
+from scrapy.utils.job import job_dir
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"VBBLOOM2"
+_HEADER = struct.Struct("<8sdQI")  # magic, error_rate, initial_capacity, slice count
+_SLICE_HEADER = struct.Struct("<QdQQI")  # capacity, error_rate, count, num_bits, num_hashes
+
+
+class BloomSlice:
+    """Fixed-size Bloom filter keyed by request fingerprints."""
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        *,
+        seed: int = 0,
+        count: int = 0,
+        num_bits: int | None = None,
+        num_hashes: int | None = None,
+        bits: bytearray | None = None,
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.seed = seed
+        self._salt = seed.to_bytes(hashlib.blake2b.SALT_SIZE, "little")
+        self.count = count
+        self.num_bits = num_bits or max(
+            8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.num_hashes = num_hashes or max(1, math.ceil(math.log2(1 / error_rate)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, fp: bytes):
+        # Salting by slice keeps false positives independent across slices;
+        # double hashing then derives all positions from one 128-bit digest.
+        digest = hashlib.blake2b(fp, digest_size=16, salt=self._salt).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, fp: bytes) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fp))
+
+    def add(self, fp: bytes) -> None:
+        bits = self.bits
+        for pos in self._positions(fp):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    """
+    Chain of Bloom slices that grows as fingerprints are added.
+    Each new slice doubles capacity and halves its error rate, so the expected
+    compound false-positive rate stays around ``error_rate``.
+    """
+
+    growth = 2
+    tightening = 0.5
+
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 0.001) -> None:
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.slices: List[BloomSlice] = []
+
+    def __contains__(self, fp: bytes) -> bool:
+        return any(fp in bloom for bloom in reversed(self.slices))
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.slices)
+
+    def add(self, fp: bytes) -> bool:
+        """Add ``fp``; return True if it was (probably) already present."""
+        if fp in self:
+            return True
+        if not self.slices or self.slices[-1].full:
+            idx = len(self.slices)
+            self.slices.append(
+                BloomSlice(
+                    self.initial_capacity * self.growth**idx,
+                    self.error_rate * (1 - self.tightening) * self.tightening**idx,
+                    seed=idx,
+                )
+            )
+        self.slices[-1].add(fp)
+        return False
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(len(bloom.bits) for bloom in self.slices)
+
+    def dump(self, fh: BinaryIO) -> None:
+        fh.write(_HEADER.pack(_MAGIC, self.error_rate, self.initial_capacity, len(self.slices)))
+        for bloom in self.slices:
+            fh.write(
+                _SLICE_HEADER.pack(
+                    bloom.capacity,
+                    bloom.error_rate,
+                    bloom.count,
+                    bloom.num_bits,
+                    bloom.num_hashes,
+                )
+            )
+            fh.write(bloom.bits)
+
+    @classmethod
+    def load(cls, fh: BinaryIO) -> "ScalableBloomFilter":
+        magic, error_rate, initial_capacity, num_slices = _HEADER.unpack(
+            fh.read(_HEADER.size)
+        )
+        if magic != _MAGIC:
+            raise ValueError("not a bloom filter state file")
+        sbf = cls(initial_capacity, error_rate)
+        for idx in range(num_slices):
+            capacity, slice_error, count, num_bits, num_hashes = _SLICE_HEADER.unpack(
+                fh.read(_SLICE_HEADER.size)
+            )
+            bits = bytearray((num_bits + 7) // 8)
+            if fh.readinto(bits) != len(bits):
+                raise ValueError("truncated bloom filter state file")
+            sbf.slices.append(
+                BloomSlice(
+                    capacity,
+                    slice_error,
+                    seed=idx,
+                    count=count,
+                    num_bits=num_bits,
+                    num_hashes=num_hashes,
+                    bits=bits,
+                )
+            )
+        return sbf
+
+
+def load_state(
+    state_path: Path, capacity: int, error_rate: float, seen_path: Path | None = None
+) -> ScalableBloomFilter:
+    """Read a saved filter, falling back to a fresh one seeded from ``seen_path``."""
+    if state_path.exists():
+        try:
+            with state_path.open("rb") as fh:
+                bloom = ScalableBloomFilter.load(fh)
+            logger.info(
+                "Loaded dupefilter state: %d fingerprints, %d bytes",
+                len(bloom),
+                bloom.memory_bytes,
+            )
+            return bloom
+        except (ValueError, struct.error):
+            logger.warning("Ignoring unreadable dupefilter state at %s", state_path)
+
+    bloom = ScalableBloomFilter(capacity, error_rate)
+    if seen_path and seen_path.exists():
+        import_seen_file(bloom, seen_path)
+    return bloom
+
+
+def import_seen_file(bloom: ScalableBloomFilter, seen_path: Path) -> int:
+    """Add the hex fingerprints of a ``requests.seen`` file, skipping bad lines."""
+    added = skipped = 0
+    with seen_path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                fp = bytes.fromhex(line)
+            except ValueError:
+                skipped += 1
+                continue
+            bloom.add(fp)
+            added += 1
+    if skipped:
+        logger.warning("Skipped %d malformed fingerprints in %s", skipped, seen_path)
+    logger.info("Imported %d fingerprints from %s", added, seen_path)
+    return added
+
+
+def save_state(bloom: ScalableBloomFilter, state_path: Path) -> None:
+    tmp_path = state_path.with_suffix(".tmp")
+    with tmp_path.open("wb") as fh:
+        bloom.dump(fh)
+    os.replace(tmp_path, state_path)
+
+
+class BloomDupeFilter(RFPDupeFilter):
+    """
+    Drop-in replacement for Scrapy's RFPDupeFilter backed by a scalable Bloom
+    filter instead of a set of hex fingerprints.
+
+    With JOBDIR set, state is checkpointed to ``requests.bloom`` every
+    ``checkpoint_every`` new fingerprints and on close, and read back in one
+    pass on resume; an existing ``requests.seen`` from the default filter is
+    imported once so in-flight jobs can switch over.
+    """
+
+    state_filename = "requests.bloom"
+
+    def __init__(
+        self,
+        path: str | None = None,
+        debug: bool = False,
+        *,
+        fingerprinter=None,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        checkpoint_every: int = 10_000,
+        stats=None,
+    ) -> None:
+        super().__init__(None, debug, fingerprinter=fingerprinter)
+        self.stats = stats
+        self.checkpoint_every = checkpoint_every
+        self._unsaved = 0
+        self.state_path = Path(path, self.state_filename) if path else None
+        if self.state_path:
+            self.bloom = load_state(
+                self.state_path, capacity, error_rate, Path(path, "requests.seen")
+            )
+        else:
+            self.bloom = ScalableBloomFilter(capacity, error_rate)
+
+    @classmethod
+    def from_settings(cls, settings, *, fingerprinter=None, stats=None):
+        return cls(
+            job_dir(settings),
+            settings.getbool("DUPEFILTER_DEBUG"),
+            fingerprinter=fingerprinter,
+            capacity=settings.getint("DUPEFILTER_BLOOM_CAPACITY", 100_000),
+            error_rate=settings.getfloat("DUPEFILTER_BLOOM_ERROR_RATE", 0.001),
+            checkpoint_every=settings.getint("DUPEFILTER_BLOOM_CHECKPOINT", 10_000),
+            stats=stats,
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls.from_settings(
+            crawler.settings,
+            fingerprinter=crawler.request_fingerprinter,
+            stats=crawler.stats,
+        )
+
+    def request_seen(self, request) -> bool:
+        if self.bloom.add(self.fingerprinter.fingerprint(request)):
+            return True
+        if self.state_path and self.checkpoint_every:
+            self._unsaved += 1
+            if self._unsaved >= self.checkpoint_every:
+                save_state(self.bloom, self.state_path)
+                self._unsaved = 0
+        return False
+
+    def close(self, reason: str) -> None:
+        if self.stats is not None:
+            self.stats.set_value("dupefilter/bloom_items", len(self.bloom))
+            self.stats.set_value("dupefilter/bloom_slices", len(self.bloom.slices))
+            self.stats.set_value("dupefilter/bloom_memory_bytes", self.bloom.memory_bytes)
+        logger.info(
+            "Dupefilter closing: %d fingerprints in %d slices, %d bytes",
+            len(self.bloom),
+            len(self.bloom.slices),
+            self.bloom.memory_bytes,
+        )
+        if self.state_path:
+            save_state(self.bloom, self.state_path)
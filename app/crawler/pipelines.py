@@ -1,18 +1,80 @@
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 from pymongo.errors import DuplicateKeyError
+from scrapy import signals
 
+from app.config import settings
 from app.mongo import ensure_indexes, outbox_events, product_media, products
-from app.utils import build_dedupe_key, compute_fingerprint, now_utc
+from app.prices import build_price_point, record_prices
+from app.runs import mark_seen, record_close, record_progress
+from app.utils import build_outbox_event, compute_fingerprint, now_utc
 
 logger = logging.getLogger(__name__)
 
 
+def classify_change(
+    existing: Dict[str, Any] | None, product_doc: Dict[str, Any], fingerprint: str
+) -> Tuple[int, str | None, Dict[str, Any]]:
+    """
+    Decide the new version, outbox event type and change summary for a scraped
+    product against its stored document. A previously removed product that is
+    seen again is always a new version, flagged as ``restored``.
+    """
+    change: Dict[str, Any] = {"changed_fields": [], "previous_version": None}
+    if not existing:
+        return 1, "product_created", change
+    if existing.get("fingerprint") == fingerprint and not existing.get("removed_at"):
+        return existing.get("version", 1), None, change
+
+    change["previous_version"] = existing.get("version")
+    change["changed_fields"] = [
+        field
+        for field in ["title", "price", "url"]
+        if product_doc.get(field) != existing.get(field)
+    ]
+    if existing.get("removed_at"):
+        change["changed_fields"].append("restored")
+    return existing.get("version", 1) + 1, "product_updated", change
+
+
 class MongoPipeline:
+    def __init__(self, stats=None):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls(stats=crawler.stats)
+        crawler.signals.connect(pipeline.spider_closed, signal=signals.spider_closed)
+        return pipeline
+
     def open_spider(self, spider):
         ensure_indexes()
-        logger.info("MongoPipeline initialized for spider=%s", spider.name)
+        self.run_id = settings.crawl_run_id
+        self.batch_size = settings.pipeline_batch_size
+        self._seen_keys: List[str] = []
+        self._price_points: List[Dict[str, Any]] = []
+        self._counts = {"items": 0, "new": 0, "updated": 0}
+        logger.info(
+            "MongoPipeline initialized for spider=%s run_id=%s", spider.name, self.run_id
+        )
+
+    def close_spider(self, spider):
+        self.flush()
+
+    def spider_closed(self, spider, reason):
+        if self.run_id and self.stats is not None:
+            record_close(self.run_id, reason, self.stats.get_stats())
+
+    def flush(self) -> None:
+        record_prices(self._price_points)
+        if self.run_id:
+            mark_seen(self.run_id, self._seen_keys)
+            if self._counts["items"]:
+                record_progress(self.run_id, **self._counts)
+        self._seen_keys = []
+        self._price_points = []
+        self._counts = {"items": 0, "new": 0, "updated": 0}
 
     def process_item(self, item, spider):
         product_key = item["product_key"]
@@ -38,29 +100,15 @@ class MongoPipeline:
         fingerprint = compute_fingerprint(fingerprint_payload, exclude=["raw"])
 
         existing = products().find_one({"_id": product_key})
-        version = 1
-        event_type = "product_created"
-        change: Dict[str, Any] = {"changed_fields": [], "previous_version": None}
-
-        if existing:
-            if existing.get("fingerprint") == fingerprint:
-                version = existing.get("version", 1)
-                event_type = None
-            else:
-                version = existing.get("version", 1) + 1
-                change["previous_version"] = existing.get("version")
-                change["changed_fields"] = [
-                    field
-                    for field in ["title", "price", "url"]
-                    if product_doc.get(field) != existing.get(field)
-                ]
-                event_type = "product_updated"
+        version, event_type, change = classify_change(existing, product_doc, fingerprint)
 
         product_doc.update(
             {
                 "fingerprint": fingerprint,
                 "version": version,
                 "updated_at": now,
+                "removed_at": None,
+                "removed_run_id": None,
             }
         )
         if not existing:
@@ -93,7 +141,6 @@ class MongoPipeline:
                 logger.debug("Duplicate media ignored for product %s", product_key)
 
         if event_type:
-            dedupe_key = build_dedupe_key(product_key, version, event_type)
             payload = {
                 "product": {
                     "product_key": product_key,
@@ -104,22 +151,22 @@ class MongoPipeline:
                 },
                 "change": change,
             }
+            event = build_outbox_event(product_key, version, event_type, payload, now)
             try:
-                outbox_events().insert_one(
-                    {
-                        "dedupe_key": dedupe_key,
-                        "product_key": product_key,
-                        "version": version,
-                        "event_type": event_type,
-                        "payload": payload,
-                        "status": "pending",
-                        "try_count": 0,
-                        "last_error": None,
-                        "created_at": now,
-                        "updated_at": now,
-                    }
-                )
+                outbox_events().insert_one(event)
             except DuplicateKeyError:
-                logger.debug("Outbox duplicate suppressed for %s", dedupe_key)
+                logger.debug("Outbox duplicate suppressed for %s", event["dedupe_key"])
+
+        self._seen_keys.append(product_key)
+        price_point = build_price_point(product_key, product_doc.get("price"), now, self.run_id)
+        if price_point:
+            self._price_points.append(price_point)
+        self._counts["items"] += 1
+        if event_type == "product_created":
+            self._counts["new"] += 1
+        elif event_type == "product_updated":
+            self._counts["updated"] += 1
+        if len(self._seen_keys) >= self.batch_size:
+            self.flush()
 
         return item
@@ -20,4 +20,9 @@ LOG_STDOUT = True
 DATA_DIR = Path(os.getenv("DATA_DIR", "/data"))
 JOBDIR = os.getenv("SCRAPY_JOBDIR", str(DATA_DIR / "state" / "scrapy-job"))
 
+DUPEFILTER_CLASS = "app.crawler.dupefilters.BloomDupeFilter"
+DUPEFILTER_BLOOM_CAPACITY = int(os.getenv("DUPEFILTER_BLOOM_CAPACITY", "100000"))
+DUPEFILTER_BLOOM_ERROR_RATE = float(os.getenv("DUPEFILTER_BLOOM_ERROR_RATE", "0.001"))
+DUPEFILTER_BLOOM_CHECKPOINT = int(os.getenv("DUPEFILTER_BLOOM_CHECKPOINT", "10000"))
+
 FEEDS = {}
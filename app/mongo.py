@@ -1,6 +1,6 @@
 from functools import lru_cache
 
-from pymongo import ASCENDING, MongoClient
+from pymongo import ASCENDING, DESCENDING, MongoClient
 from pymongo.collection import Collection
 from pymongo.database import Database
 
@@ -32,7 +32,19 @@ def send_receipts() -> Collection:
     return get_db()["send_receipts"]
 
 
+def crawl_runs() -> Collection:
+    return get_db()["crawl_runs"]
+
+
+def price_history() -> Collection:
+    return get_db()["price_history"]
+
+
 def ensure_indexes() -> None:
+    products().create_index(
+        [("removed_at", ASCENDING), ("last_seen_run_id", ASCENDING)],
+        name="removed_seen_idx",
+    )
     product_media().create_index(
         [
             ("product_key", ASCENDING),
@@ -57,4 +69,15 @@ def ensure_indexes() -> None:
         unique=True,
         name="uniq_receipt",
     )
-
+    crawl_runs().create_index(
+        [("started_at", DESCENDING)],
+        name="started_at_idx",
+    )
+    price_history().create_index(
+        [("product_key", ASCENDING), ("month", ASCENDING)],
+        name="product_month_idx",
+    )
+    price_history().create_index(
+        [("month", ASCENDING), ("last_ts", ASCENDING)],
+        name="month_last_ts_idx",
+    )
@@ -0,0 +1,176 @@
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+from app.mongo import price_history
+from app.utils import now_utc
+
+
+def parse_amount(amount: Any) -> float | None:
+    """
+    Parse a scraped price amount. With both separators present the last one is
+    the decimal point; a lone separator followed by exactly three digits is a
+    thousands separator. Ambiguous or malformed values return None.
+    """
+    if amount is None:
+        return None
+    if isinstance(amount, (int, float)):
+        return float(amount)
+    match = re.search(r"[0-9][0-9.,]*", str(amount))
+    if not match:
+        return None
+    text = match.group(0).rstrip(".,")
+    separators = [char for char in text if char in ".,"]
+    decimal = None
+    if len(set(separators)) == 2:
+        decimal = separators[-1]
+        if separators.count(decimal) > 1:
+            return None
+    elif len(separators) == 1 and len(text.rpartition(separators[0])[2]) != 3:
+        decimal = separators[0]
+
+    integer, fraction = text, ""
+    if decimal:
+        integer, _, fraction = text.rpartition(decimal)
+    groups = re.split(r"[.,]", integer)
+    if len(groups) > 1 and any(len(group) != 3 for group in groups[1:]):
+        return None
+    number = "".join(groups)
+    if fraction:
+        number = f"{number}.{fraction}"
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+def month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def build_price_point(
+    product_key: str, price: Dict[str, Any] | None, ts: datetime, run_id: str | None
+) -> Dict[str, Any] | None:
+    amount = parse_amount((price or {}).get("amount"))
+    if amount is None:
+        return None
+    return {
+        "product_key": product_key,
+        "ts": ts,
+        "amount": amount,
+        "currency": (price or {}).get("currency"),
+        "run_id": run_id,
+    }
+
+
+def record_prices(points: List[Dict[str, Any]]) -> None:
+    """Append observations to per-product monthly buckets in one bulk write."""
+    if not points:
+        return
+    ops = []
+    for point in points:
+        month = month_start(point["ts"])
+        product_key = point["product_key"]
+        ops.append(
+            UpdateOne(
+                {"_id": f"{product_key}:{month:%Y-%m}"},
+                {
+                    "$setOnInsert": {"product_key": product_key, "month": month},
+                    "$push": {
+                        "points": {
+                            "ts": point["ts"],
+                            "amount": point["amount"],
+                            "currency": point["currency"],
+                            "run_id": point["run_id"],
+                        }
+                    },
+                    "$inc": {"count": 1},
+                    "$min": {"min_amount": point["amount"], "first_ts": point["ts"]},
+                    "$max": {"max_amount": point["amount"], "last_ts": point["ts"]},
+                    "$set": {"last_amount": point["amount"]},
+                },
+                upsert=True,
+            )
+        )
+    price_history().bulk_write(ops, ordered=False)
+
+
+def get_price_history(product_key: str, days: int = 90) -> List[Dict[str, Any]]:
+    since = now_utc() - timedelta(days=days)
+    pipeline = [
+        {"$match": {"product_key": product_key, "month": {"$gte": month_start(since)}}},
+        {"$sort": {"month": 1}},
+        {"$unwind": "$points"},
+        {"$match": {"points.ts": {"$gte": since}}},
+        {"$replaceRoot": {"newRoot": "$points"}},
+    ]
+    return list(price_history().aggregate(pipeline))
+
+
+def find_price_drops(min_drop_pct: float, days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Products whose latest price is at least ``min_drop_pct`` percent below
+    their peak within the last ``days`` days, biggest drops first.
+    """
+    since = now_utc() - timedelta(days=days)
+    pipeline = [
+        {"$match": {"month": {"$gte": month_start(since)}, "last_ts": {"$gte": since}}},
+        {"$unwind": "$points"},
+        {"$match": {"points.ts": {"$gte": since}}},
+        # Peak and latest point per (product, currency), then keep only the
+        # currency of the most recent observation so a currency switch is
+        # never read as a drop. $top needs MongoDB 5.2+.
+        {
+            "$group": {
+                "_id": {"product_key": "$product_key", "currency": "$points.currency"},
+                "peak": {"$max": "$points.amount"},
+                "latest": {
+                    "$top": {
+                        "sortBy": {"points.ts": -1},
+                        "output": {"amount": "$points.amount", "ts": "$points.ts"},
+                    }
+                },
+            }
+        },
+        {
+            "$group": {
+                "_id": "$_id.product_key",
+                "current": {
+                    "$top": {
+                        "sortBy": {"latest.ts": -1},
+                        "output": {
+                            "peak": "$peak",
+                            "latest": "$latest.amount",
+                            "currency": "$_id.currency",
+                            "latest_ts": "$latest.ts",
+                        },
+                    }
+                },
+            }
+        },
+        {
+            "$project": {
+                "peak": "$current.peak",
+                "latest": "$current.latest",
+                "currency": "$current.currency",
+                "latest_ts": "$current.latest_ts",
+            }
+        },
+        {"$match": {"peak": {"$gt": 0}}},
+        {
+            "$addFields": {
+                "drop_pct": {
+                    "$multiply": [
+                        {"$divide": [{"$subtract": ["$peak", "$latest"]}, "$peak"]},
+                        100,
+                    ]
+                }
+            }
+        },
+        {"$match": {"drop_pct": {"$gte": min_drop_pct}}},
+        {"$sort": {"drop_pct": -1}},
+        {"$limit": limit},
+    ]
+    return list(price_history().aggregate(pipeline, allowDiskUse=True))
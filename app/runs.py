@@ -0,0 +1,208 @@
+import logging
+import uuid
+from typing import Any, Dict, List, Tuple
+
+from pymongo.errors import BulkWriteError
+
+from app.mongo import crawl_runs, outbox_events, products
+from app.utils import build_outbox_event, now_utc
+
+logger = logging.getLogger(__name__)
+
+
+def start_run(mode: str) -> str:
+    run_id = uuid.uuid4().hex
+    crawl_runs().insert_one(
+        {
+            "_id": run_id,
+            "mode": mode,
+            "status": "running",
+            "items": 0,
+            "new": 0,
+            "updated": 0,
+            "removed": 0,
+            "started_at": now_utc(),
+            "finish_reason": None,
+            "crawl_stats": {},
+            "removal_skipped": None,
+            "finished_at": None,
+            "duration_seconds": 0,
+            "attempts": 1,
+            "unclean_resume": False,
+            "error": None,
+        }
+    )
+    return run_id
+
+
+def find_unfinished_full_run() -> Dict[str, Any] | None:
+    """Latest full run that was interrupted or failed and can be resumed."""
+    return crawl_runs().find_one(
+        {"mode": "full", "status": {"$in": ["running", "failed"]}},
+        sort=[("started_at", -1)],
+    )
+
+
+def resume_run(run: Dict[str, Any]) -> None:
+    """
+    Reopen an unfinished full run. A run still marked ``running`` was killed
+    without cleanup, so its on-disk request queue may have lost entries.
+    """
+    update: Dict[str, Any] = {
+        "status": "running",
+        "finish_reason": None,
+        "crawl_stats": {},
+        "error": None,
+    }
+    if run.get("status") == "running":
+        update["unclean_resume"] = True
+    crawl_runs().update_one(
+        {"_id": run["_id"]},
+        {"$set": update, "$inc": {"attempts": 1}},
+    )
+
+
+def record_progress(run_id: str, items: int, new: int, updated: int) -> None:
+    crawl_runs().update_one(
+        {"_id": run_id},
+        {"$inc": {"items": items, "new": new, "updated": updated}},
+    )
+
+
+def summarize_crawl_stats(stats: Dict[str, Any]) -> Dict[str, int]:
+    """Reduce Scrapy's stats to the counters the removal sweep checks."""
+    return {
+        "errors": stats.get("log_count/ERROR", 0),
+        "retries_exhausted": stats.get("retry/max_reached", 0),
+        "spider_exceptions": sum(
+            v for k, v in stats.items() if k.startswith("spider_exceptions/")
+        ),
+        "responses_5xx": sum(
+            v for k, v in stats.items() if k.startswith("downloader/response_status_count/5")
+        ),
+        "responses": stats.get("downloader/response_count", 0),
+    }
+
+
+def record_close(run_id: str, reason: str, stats: Dict[str, Any]) -> None:
+    crawl_runs().update_one(
+        {"_id": run_id},
+        {"$set": {"finish_reason": reason, "crawl_stats": summarize_crawl_stats(stats)}},
+    )
+
+
+def count_unseen(run_id: str) -> Tuple[int, int]:
+    """Return (current products, current products not seen by ``run_id``)."""
+    current = products().count_documents({"removed_at": None})
+    unseen = products().count_documents(
+        {"removed_at": None, "last_seen_run_id": {"$ne": run_id}}
+    )
+    return current, unseen
+
+
+def removal_skip_reason(
+    run: Dict[str, Any], current: int, unseen: int, max_ratio: float
+) -> str | None:
+    """
+    Return why the removal sweep must not run for ``run``, or None if the crawl
+    looks complete enough to treat the ``unseen`` of ``current`` products as gone.
+    """
+    if run.get("finish_reason") != "finished":
+        return f"finish_reason={run.get('finish_reason')}"
+    if run.get("unclean_resume"):
+        return "resumed after an unclean shutdown"
+    crawl_stats = run.get("crawl_stats") or {}
+    # 5xx responses that a retry later recovered are expected; only failures
+    # that can lose a page block the sweep.
+    failures = {
+        key: crawl_stats[key]
+        for key in ("errors", "retries_exhausted", "spider_exceptions")
+        if crawl_stats.get(key)
+    }
+    if failures:
+        return f"crawl errors {failures}"
+    if not run.get("items"):
+        return "no items"
+    if current and unseen / current > max_ratio:
+        return f"would remove {unseen} of {current} products"
+    return None
+
+
+def mark_seen(run_id: str, product_keys: List[str]) -> None:
+    if not product_keys:
+        return
+    products().update_many(
+        {"_id": {"$in": product_keys}},
+        {"$set": {"last_seen_run_id": run_id, "last_seen_at": now_utc()}},
+    )
+
+
+def mark_unseen_removed(run_id: str, batch_size: int = 500) -> int:
+    """
+    Flag every current product not stamped by ``run_id`` as removed and queue
+    a ``product_removed`` outbox event for each. Only valid after a full crawl.
+    """
+    now = now_utc()
+    result = products().update_many(
+        {"removed_at": None, "last_seen_run_id": {"$ne": run_id}},
+        {"$set": {"removed_at": now, "removed_run_id": run_id, "updated_at": now}},
+    )
+    removed = result.modified_count
+    if not removed:
+        return 0
+
+    cursor = products().find(
+        {"removed_at": now, "removed_run_id": run_id},
+        {"url": 1, "title": 1, "price": 1, "version": 1},
+    )
+    batch: List[Dict[str, Any]] = []
+    for doc in cursor:
+        version = doc.get("version", 1)
+        payload = {
+            "product": {
+                "product_key": doc["_id"],
+                "url": doc.get("url"),
+                "title": doc.get("title"),
+                "price": doc.get("price"),
+                "version": version,
+            },
+            "change": {"changed_fields": ["removed"], "previous_version": version},
+        }
+        batch.append(build_outbox_event(doc["_id"], version, "product_removed", payload, now))
+        if len(batch) >= batch_size:
+            _insert_events(batch)
+            batch = []
+    _insert_events(batch)
+    return removed
+
+
+def _insert_events(events: List[Dict[str, Any]]) -> None:
+    if not events:
+        return
+    try:
+        outbox_events().insert_many(events, ordered=False)
+    except BulkWriteError:
+        logger.debug("Outbox duplicates suppressed in removal batch")
+
+
+def finish_run(
+    run_id: str,
+    status: str,
+    duration_seconds: float,
+    removed: int = 0,
+    error: str | None = None,
+    removal_skipped: str | None = None,
+) -> None:
+    crawl_runs().update_one(
+        {"_id": run_id},
+        {
+            "$set": {
+                "status": status,
+                "removed": removed,
+                "finished_at": now_utc(),
+                "error": error,
+                "removal_skipped": removal_skipped,
+            },
+            "$inc": {"duration_seconds": duration_seconds},
+        },
+    )
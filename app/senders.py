@@ -141,7 +141,31 @@ def send_strategy_s3(product: dict, change: dict | None) -> Tuple[Iterable[int],
     return message_ids, "S3"
 
 
-def send_with_strategy(strategy: str, product: dict, change: dict | None = None):
+def send_removed_notice(product: dict) -> Tuple[Iterable[int], str]:
+    """Removal notice: text only, without the product link button."""
+    target_chat = settings.telegram_target_chat
+    if not target_chat:
+        raise RuntimeError("TG_TARGET_CHAT not configured")
+
+    text = "\n".join(
+        [
+            f"已下架: {product.get('title', 'Unknown')}",
+            f"URL: {product.get('url')}",
+        ]
+    )
+    with _create_client() as app:
+        msg = app.send_message(chat_id=target_chat, text=text)
+        return [msg.id], "removed"
+
+
+def send_with_strategy(
+    strategy: str,
+    product: dict,
+    change: dict | None = None,
+    event_type: str | None = None,
+):
+    if event_type == "product_removed":
+        return send_removed_notice(product)
     strategy = (strategy or "S2").upper()
     if strategy == "S1":
         return send_strategy_s1(product)
@@ -1,6 +1,8 @@
 import logging
 import os
+import shutil
 import subprocess
+import time
 from pathlib import Path
 from typing import List
 
@@ -10,10 +12,22 @@ from pymongo import ReturnDocument
 from app.celery_app import celery_app
 from app.config import settings
 from app.mongo import (
+    crawl_runs,
     ensure_indexes,
     outbox_events,
     send_receipts,
 )
+from app.crawler import settings as crawler_settings
+from app.crawler.dupefilters import BloomDupeFilter
+from app.runs import (
+    count_unseen,
+    find_unfinished_full_run,
+    finish_run,
+    mark_unseen_removed,
+    removal_skip_reason,
+    resume_run,
+    start_run,
+)
 from app.senders import send_with_strategy
 from app.utils import now_utc
 
@@ -26,24 +40,91 @@ def _ensure_dirs() -> None:
 
 
 @celery_app.task(name="app.tasks.crawl_site")
-def crawl_site(force_full: bool | None = None) -> None:
+def crawl_site(force_full: bool | None = None) -> str:
     """
     Trigger scrapy crawl via subprocess. First run is full, later runs incremental.
+    Each run is recorded in `crawl_runs`; a full run that Scrapy reports as
+    "finished" without errors marks every product it did not see as removed.
+    An interrupted full run is resumed, under the same run_id, before anything else.
     """
     _ensure_dirs()
+    ensure_indexes()
     state_file = Path(settings.data_dir, "state", "crawl_state.txt")
-    mode = "incremental"
-    if force_full or not state_file.exists():
+    full_job_dir = Path(settings.data_dir, "state", "scrapy-job-full")
+    unfinished = find_unfinished_full_run()
+    if unfinished:
         mode = "full"
+        run_id = unfinished["_id"]
+        resume_run(unfinished)
+        logger.info("Resuming full crawl run_id=%s", run_id)
+    else:
+        mode = "incremental"
+        if force_full or not state_file.exists():
+            mode = "full"
+            # Stale state from a run whose ledger row is gone must not leak
+            # old fingerprints into a fresh full crawl.
+            shutil.rmtree(full_job_dir, ignore_errors=True)
+        run_id = start_run(mode)
     env = os.environ.copy()
     env["CRAWL_MODE"] = mode
+    env["CRAWL_RUN_ID"] = run_id
     log_args: List[str] = []
     if settings.crawl_log:
         log_args = ["-s", f"LOG_FILE={settings.crawl_log}"]
-    cmd = ["scrapy", "crawl", settings.crawl_spider, *log_args]
-    logger.info("Starting crawl: mode=%s cmd=%s", mode, " ".join(cmd))
-    subprocess.run(cmd, check=True, env=env, cwd=str(Path(__file__).resolve().parent.parent))
+    job_args: List[str] = []
+    if mode == "full":
+        # Full runs keep their own resumable job dir and a much tighter Bloom
+        # error rate: a false positive here drops a live product page, which
+        # the removal sweep would then report as removed.
+        job_args = [
+            "-s",
+            f"JOBDIR={full_job_dir}",
+            "-s",
+            f"DUPEFILTER_BLOOM_ERROR_RATE={settings.full_crawl_bloom_error_rate}",
+        ]
+    cmd = ["scrapy", "crawl", settings.crawl_spider, *log_args, *job_args]
+    logger.info("Starting crawl: run_id=%s mode=%s cmd=%s", run_id, mode, " ".join(cmd))
+    started = time.monotonic()
+    removed = 0
+    skipped = None
+    try:
+        subprocess.run(cmd, check=True, env=env, cwd=str(Path(__file__).resolve().parent.parent))
+        if mode == "full":
+            run = crawl_runs().find_one({"_id": run_id}) or {}
+            current, unseen = count_unseen(run_id)
+            skipped = removal_skip_reason(run, current, unseen, settings.removal_max_ratio)
+            if skipped:
+                logger.warning("Skipping removal sweep for run %s: %s", run_id, skipped)
+            else:
+                removed = mark_unseen_removed(run_id, batch_size=settings.pipeline_batch_size)
+            _promote_full_state(full_job_dir)
+    except Exception as exc:
+        # The full job dir is kept so the next crawl_site call resumes it.
+        finish_run(run_id, "failed", time.monotonic() - started, removed=removed, error=str(exc))
+        raise
+    finish_run(
+        run_id,
+        "succeeded",
+        time.monotonic() - started,
+        removed=removed,
+        removal_skipped=skipped,
+    )
     state_file.write_text(now_utc().isoformat())
+    logger.info("Crawl finished: run_id=%s removed=%d", run_id, removed)
+    return run_id
+
+
+def _promote_full_state(full_job_dir: Path) -> None:
+    """
+    Replace the shared incremental dupefilter state with the completed full
+    run's, then drop the full run's job dir.
+    """
+    full_state = full_job_dir / BloomDupeFilter.state_filename
+    if full_state.exists():
+        shared_dir = Path(crawler_settings.JOBDIR)
+        shared_dir.mkdir(parents=True, exist_ok=True)
+        os.replace(full_state, shared_dir / BloomDupeFilter.state_filename)
+    shutil.rmtree(full_job_dir, ignore_errors=True)
 
 
 @celery_app.task(name="app.tasks.dispatch_outbox")
@@ -87,7 +168,10 @@ def send_event(event_id: str) -> str:
     change = event.get("payload", {}).get("change") or {}
     try:
         message_ids, strategy = send_with_strategy(
-            settings.message_strategy, product=product, change=change
+            settings.message_strategy,
+            product=product,
+            change=change,
+            event_type=event.get("event_type"),
         )
         send_receipts().insert_one(
             {
@@ -18,3 +18,24 @@ def compute_fingerprint(payload: Dict[str, Any], exclude: Iterable[str] | None =
 def build_dedupe_key(product_key: str, version: int, event_type: str) -> str:
     raw = f"{product_key}:{version}:{event_type}"
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def build_outbox_event(
+    product_key: str,
+    version: int,
+    event_type: str,
+    payload: Dict[str, Any],
+    now: datetime,
+) -> Dict[str, Any]:
+    return {
+        "dedupe_key": build_dedupe_key(product_key, version, event_type),
+        "product_key": product_key,
+        "version": version,
+        "event_type": event_type,
+        "payload": payload,
+        "status": "pending",
+        "try_count": 0,
+        "last_error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
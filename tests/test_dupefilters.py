@@ -0,0 +1,57 @@
+import hashlib
+import io
+
+from app.crawler.dupefilters import ScalableBloomFilter, load_state, save_state
+
+
+def _fp(prefix: str, i: int) -> bytes:
+    return hashlib.sha1(f"{prefix}:{i}".encode("utf-8")).digest()
+
+
+def test_dump_load_round_trip():
+    bloom = ScalableBloomFilter(initial_capacity=1_000, error_rate=0.01)
+    for i in range(3_500):
+        bloom.add(_fp("member", i))
+
+    buf = io.BytesIO()
+    bloom.dump(buf)
+    buf.seek(0)
+    loaded = ScalableBloomFilter.load(buf)
+
+    assert len(loaded) == len(bloom)
+    assert loaded.memory_bytes == bloom.memory_bytes
+    assert [s.bits for s in loaded.slices] == [s.bits for s in bloom.slices]
+    assert all(_fp("member", i) in loaded for i in range(3_500))
+
+
+def test_false_positive_rate_within_bound():
+    error_rate = 0.001
+    bloom = ScalableBloomFilter(initial_capacity=10_000, error_rate=error_rate)
+    for i in range(70_000):  # fills three slices
+        bloom.add(_fp("member", i))
+
+    trials = 100_000
+    false_positives = sum(_fp("other", i) in bloom for i in range(trials))
+    assert false_positives / trials <= error_rate
+
+
+def test_load_state_skips_malformed_seen_lines(tmp_path):
+    seen = tmp_path / "requests.seen"
+    seen.write_text(f"{_fp('a', 1).hex()}\nnot-hex\n\n{_fp('a', 2).hex()}\n", encoding="utf-8")
+
+    bloom = load_state(tmp_path / "requests.bloom", 1_000, 0.01, seen)
+
+    assert len(bloom) == 2
+    assert _fp("a", 1) in bloom and _fp("a", 2) in bloom
+
+
+def test_save_state_then_load_prefers_bloom_file(tmp_path):
+    state = tmp_path / "requests.bloom"
+    bloom = ScalableBloomFilter(initial_capacity=1_000, error_rate=0.01)
+    bloom.add(_fp("a", 1))
+    save_state(bloom, state)
+
+    loaded = load_state(state, 1_000, 0.01, tmp_path / "requests.seen")
+
+    assert len(loaded) == 1
+    assert _fp("a", 1) in loaded
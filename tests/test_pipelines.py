@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+from app.crawler.pipelines import classify_change
+
+PRODUCT = {"title": "Dress", "price": {"amount": "10", "currency": "$"}, "url": "https://x/p/1"}
+
+
+def test_new_product_is_created():
+    assert classify_change(None, PRODUCT, "fp1") == (
+        1,
+        "product_created",
+        {"changed_fields": [], "previous_version": None},
+    )
+
+
+def test_unchanged_product_emits_nothing():
+    existing = {**PRODUCT, "fingerprint": "fp1", "version": 3, "removed_at": None}
+    version, event_type, _ = classify_change(existing, PRODUCT, "fp1")
+    assert (version, event_type) == (3, None)
+
+
+def test_changed_product_bumps_version():
+    existing = {**PRODUCT, "price": {"amount": "12", "currency": "$"}, "fingerprint": "old", "version": 3}
+    assert classify_change(existing, PRODUCT, "fp1") == (
+        4,
+        "product_updated",
+        {"changed_fields": ["price"], "previous_version": 3},
+    )
+
+
+def test_removed_product_seen_again_is_restored():
+    existing = {
+        **PRODUCT,
+        "fingerprint": "fp1",
+        "version": 3,
+        "removed_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+    }
+    assert classify_change(existing, PRODUCT, "fp1") == (
+        4,
+        "product_updated",
+        {"changed_fields": ["restored"], "previous_version": 3},
+    )
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.prices import build_price_point, parse_amount
+
+TS = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("1,299", 1299.0),
+        ("1.299", 1299.0),
+        ("12,99", 12.99),
+        ("12.99", 12.99),
+        ("1.299,00", 1299.0),
+        ("1,299.00", 1299.0),
+        ("1.299.000", 1299000.0),
+        ("1,299,000.50", 1299000.5),
+        ("$ 45", 45.0),
+        ("45.", 45.0),
+        ("0,5", 0.5),
+        (19, 19.0),
+        (19.5, 19.5),
+        ("1.29.000", None),
+        ("1,2.3,4", None),
+        ("1.299,000,5", None),
+        ("free", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_amount(raw, expected):
+    assert parse_amount(raw) == expected
+
+
+@pytest.mark.parametrize("price", [None, {}, {"amount": None, "currency": "$"}, {"currency": "$"}])
+def test_build_price_point_without_amount(price):
+    assert build_price_point("p1", price, TS, "run-1") is None
+
+
+def test_build_price_point():
+    assert build_price_point("p1", {"amount": "1.299,00", "currency": "€"}, TS, "run-1") == {
+        "product_key": "p1",
+        "ts": TS,
+        "amount": 1299.0,
+        "currency": "€",
+        "run_id": "run-1",
+    }
@@ -0,0 +1,81 @@
+import pytest
+
+from app.runs import removal_skip_reason, summarize_crawl_stats
+
+CLEAN_STATS = {"errors": 0, "retries_exhausted": 0, "spider_exceptions": 0, "responses_5xx": 0}
+
+
+def _run(**overrides):
+    run = {
+        "_id": "run-1",
+        "finish_reason": "finished",
+        "crawl_stats": dict(CLEAN_STATS),
+        "items": 90,
+        "unclean_resume": False,
+    }
+    run.update(overrides)
+    return run
+
+
+def test_summarize_crawl_stats():
+    stats = {
+        "log_count/ERROR": 2,
+        "retry/max_reached": 1,
+        "spider_exceptions/ValueError": 3,
+        "spider_exceptions/KeyError": 1,
+        "downloader/response_status_count/200": 40,
+        "downloader/response_status_count/503": 4,
+        "downloader/response_status_count/500": 1,
+        "downloader/response_count": 45,
+    }
+
+    assert summarize_crawl_stats(stats) == {
+        "errors": 2,
+        "retries_exhausted": 1,
+        "spider_exceptions": 4,
+        "responses_5xx": 5,
+        "responses": 45,
+    }
+
+
+def test_summarize_crawl_stats_empty():
+    assert summarize_crawl_stats({}) == {
+        "errors": 0,
+        "retries_exhausted": 0,
+        "spider_exceptions": 0,
+        "responses_5xx": 0,
+        "responses": 0,
+    }
+
+
+@pytest.mark.parametrize(
+    "run, current, unseen, expected",
+    [
+        (_run(finish_reason="closespider_timeout"), 100, 10, "finish_reason=closespider_timeout"),
+        (_run(finish_reason=None), 100, 10, "finish_reason=None"),
+        (_run(unclean_resume=True), 100, 10, "resumed after an unclean shutdown"),
+        (_run(crawl_stats={**CLEAN_STATS, "errors": 1}), 100, 10, "crawl errors {'errors': 1}"),
+        (
+            _run(crawl_stats={**CLEAN_STATS, "retries_exhausted": 2}),
+            100,
+            10,
+            "crawl errors {'retries_exhausted': 2}",
+        ),
+        (
+            _run(crawl_stats={**CLEAN_STATS, "spider_exceptions": 3}),
+            100,
+            10,
+            "crawl errors {'spider_exceptions': 3}",
+        ),
+        (_run(items=0), 100, 10, "no items"),
+        (_run(), 100, 21, "would remove 21 of 100 products"),
+    ],
+)
+def test_removal_skip_reason_blocks_sweep(run, current, unseen, expected):
+    assert removal_skip_reason(run, current, unseen, max_ratio=0.2) == expected
+
+
+@pytest.mark.parametrize("current, unseen", [(100, 0), (100, 20), (0, 0)])
+def test_removal_skip_reason_allows_clean_run(current, unseen):
+    run = _run(crawl_stats={**CLEAN_STATS, "responses_5xx": 4})
+    assert removal_skip_reason(run, current, unseen, max_ratio=0.2) is None